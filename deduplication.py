@@ -0,0 +1,189 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+import itertools
+import time
+
+# ======================================================================================
+# Configuration
+# ======================================================================================
+# MinHash signature length, split into LSH bands of NUM_PERM // LSH_BANDS rows.
+# With 64 permutations and 8 bands, pairs above ~0.77 Jaccard similarity are
+# very likely to share a bucket.
+NUM_PERM = 64
+LSH_BANDS = 8
+
+# Minimum estimated Jaccard similarity (fraction of matching signature values)
+# for two reviews to be merged into the same near-duplicate cluster.
+SIMILARITY_THRESHOLD = 0.8
+
+# Mersenne prime used by the universal hash permutations
+PRIME = (1 << 31) - 1
+RANDOM_STATE = 42
+
+INPUT_PATH = "data/app_reviews_cleaned.parquet"
+OUTPUT_PATH = "data/review_clusters.parquet"
+
+
+# ======================================================================================
+# MinHash Signatures
+# ======================================================================================
+def text_shingles(text):
+    """
+    Returns the word-bigram shingles of a review. Reviews with fewer than two
+    words fall back to their single token, so "top" and "mantap" still match.
+    """
+    tokens = text.split()
+    if len(tokens) < 2:
+        return [text]
+    return [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=RANDOM_STATE):
+    """
+    Computes a (len(texts), num_perm) MinHash signature matrix.
+    All shingles are hashed once into a flat array; each permutation is then a
+    single vectorized pass followed by a per-review minimum (np.minimum.reduceat).
+    """
+    shingle_lists = [text_shingles(text) for text in texts]
+    lengths = np.array([len(shingles) for shingles in shingle_lists], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    flat_shingles = np.array(
+        list(itertools.chain.from_iterable(shingle_lists)), dtype=object
+    )
+    shingle_hashes = (
+        pd.util.hash_array(flat_shingles) & np.uint64(PRIME)
+    ).astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=num_perm)
+    b = rng.integers(0, PRIME, size=num_perm)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        permuted = (a[i] * shingle_hashes + b[i]) % PRIME
+        signatures[:, i] = np.minimum.reduceat(permuted, offsets)
+    return signatures
+
+
+# ======================================================================================
+# Locality-Sensitive Hashing
+# ======================================================================================
+def lsh_clusters(signatures, bands=LSH_BANDS, threshold=SIMILARITY_THRESHOLD):
+    """
+    Groups reviews whose signatures collide in at least one LSH band and whose
+    estimated similarity passes `threshold`. Each bucket links its members to
+    the bucket's first review, so the candidate graph stays linear in size.
+    Returns a cluster id per signature row.
+    """
+    n_docs, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    doc_ids = np.arange(n_docs)
+    sources, targets = [], []
+
+    for band in range(bands):
+        band_start = band * rows_per_band
+        band_signature = signatures[:, band_start : band_start + rows_per_band]
+        bucket_keys = pd.util.hash_pandas_object(
+            pd.DataFrame(band_signature), index=False
+        ).to_numpy()
+        leaders = pd.Series(doc_ids).groupby(bucket_keys).transform("min").to_numpy()
+
+        members = np.flatnonzero(leaders != doc_ids)
+        similarity = (signatures[members] == signatures[leaders[members]]).mean(axis=1)
+        matched = members[similarity >= threshold]
+        sources.append(matched)
+        targets.append(leaders[matched])
+
+    sources = np.concatenate(sources)
+    targets = np.concatenate(targets)
+    graph = sparse.coo_matrix(
+        (np.ones(len(sources), dtype=np.int8), (sources, targets)),
+        shape=(n_docs, n_docs),
+    )
+    _, labels = connected_components(graph, directed=False)
+    return labels
+
+
+# ======================================================================================
+# Deduplication Stage
+# ======================================================================================
+def deduplicate_reviews(
+    df, text_column="review_cleaned", group_columns=("app_name", "sentiment")
+):
+    """
+    Adds duplicate information to a review DataFrame:
+    - exact_duplicate_id: identical `text_column` values share an id (hash-based)
+    - duplicate_cluster: exact and near-duplicate reviews (MinHash/LSH) share an id
+    - sample_weight: number of reviews in the same (group_columns, cluster) on the
+      first review of that group, 0 on every other member
+
+    Training on the rows with sample_weight > 0, weighted by sample_weight, is
+    equivalent to training on every raw row for exact duplicates.
+    """
+    df = df.copy()
+    texts = df[text_column].fillna("").astype(str)
+
+    # Exact duplicates: pd.factorize hashes each text once (linear time)
+    exact_ids, unique_texts = pd.factorize(texts)
+    df["exact_duplicate_id"] = exact_ids
+
+    # Near duplicates are searched among unique texts only
+    if len(unique_texts) > 0:
+        signatures = minhash_signatures(unique_texts)
+        unique_clusters = lsh_clusters(signatures)
+    else:
+        unique_clusters = np.array([], dtype=np.int64)
+    df["duplicate_cluster"] = unique_clusters[exact_ids]
+
+    key_columns = list(group_columns) + ["duplicate_cluster"]
+    cluster_size = df.groupby(key_columns)["duplicate_cluster"].transform("size")
+    is_representative = ~df.duplicated(subset=key_columns)
+    df["sample_weight"] = np.where(is_representative, cluster_size, 0)
+    return df
+
+
+if __name__ == "__main__":
+    print("Starting near-duplicate review detection...")
+
+    try:
+        df_cleaned = pd.read_parquet(INPUT_PATH)
+        print("Cleaned dataset loaded successfully.")
+    except FileNotFoundError:
+        print(
+            f"Error: '{INPUT_PATH}' not found. Please run the main analysis notebook first."
+        )
+        exit()
+
+    df_model_data = df_cleaned[df_cleaned["sentiment"] != "Netral"]
+
+    start = time.perf_counter()
+    df_dedup = deduplicate_reviews(df_model_data)
+    elapsed = time.perf_counter() - start
+
+    output_columns = [
+        "app_name",
+        "sentiment",
+        "exact_duplicate_id",
+        "duplicate_cluster",
+        "sample_weight",
+    ]
+    df_dedup[output_columns].to_parquet(OUTPUT_PATH)
+
+    n_unique = int((df_dedup["sample_weight"] > 0).sum())
+    print("=" * 60)
+    print("DEDUPLICATION COMPLETED!")
+    print(f"Duplicate clusters saved to: {OUTPUT_PATH}")
+    print(f"Reviews: {len(df_dedup)}")
+    print(f"Exact-unique texts: {df_dedup['exact_duplicate_id'].nunique()}")
+    print(f"Training rows after deduplication: {n_unique}")
+    print(f"Elapsed time: {elapsed:.1f}s")
+    print("\nRows kept per app:")
+    print(
+        df_dedup.groupby("app_name")["sample_weight"]
+        .agg(total="size", unique=lambda w: int((w > 0).sum()))
+        .to_string()
+    )
+    print("=" * 60)
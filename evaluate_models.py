@@ -0,0 +1,397 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from sklearn.metrics import accuracy_score, f1_score
+from joblib import Parallel, delayed
+from deduplication import deduplicate_reviews
+import hashlib
+import itertools
+import json
+import os
+import time
+import tracemalloc
+
+# ======================================================================================
+# Configuration
+# ======================================================================================
+# Hyperparameter grid for the TF-IDF + Logistic Regression baseline.
+# Vectorizer settings decide which feature matrices are built (and cached, one
+# per fold), while classifier settings are evaluated on top of each matrix.
+VECTORIZER_GRID = {
+    "max_features": [5000, 10000, 20000],
+    "ngram_range": [(1, 1), (1, 2)],
+}
+CLASSIFIER_GRID = {
+    "C": [0.5, 1.0, 2.0],
+}
+
+N_FOLDS = 5
+RANDOM_STATE = 42
+
+# Use every available core for the fold/grid evaluation
+N_JOBS = -1
+
+# The cleaned file holds the dashboard market's reviews, so the best configs
+# (keyed by app name) only apply to that market; pipeline.py uses the baseline
+# config for the other markets.
+INPUT_PATH = "data/app_reviews_cleaned.parquet"
+CACHE_DIR = "data/feature_cache"
+RESULTS_PATH = "data/model_evaluation.parquet"
+BEST_CONFIG_PATH = "data/best_model_config.json"
+
+
+# ======================================================================================
+# Feature Matrix Cache
+# ======================================================================================
+def data_fingerprint(X, y, w):
+    """
+    Returns a short hash of the review texts, labels and sample weights, so
+    cached matrices are invalidated automatically when the data changes.
+    """
+    row_hashes = pd.util.hash_pandas_object(
+        pd.DataFrame({"text": X.values, "label": y.values, "weight": w.values}),
+        index=False,
+    )
+    return hashlib.sha1(row_hashes.values.tobytes()).hexdigest()[:16]
+
+
+def cache_key(app_name, vectorizer_params, fingerprint, fold):
+    """
+    Builds a stable file-name-safe key for one (app, vectorizer settings, fold).
+    The fold layout (N_FOLDS, RANDOM_STATE) is part of the key because each
+    matrix is fitted on that fold's training rows.
+    """
+    settings = json.dumps(vectorizer_params, sort_keys=True)
+    split = f"{N_FOLDS}-{RANDOM_STATE}-{fold}"
+    digest = hashlib.sha1(
+        f"{fingerprint}|{settings}|{split}".encode("utf-8")
+    ).hexdigest()
+    return f"{app_name}_{digest[:16]}"
+
+
+def get_texts(X, app_name, fingerprint):
+    """
+    Stores the review texts of one app once, so vectorization workers only
+    receive a file path. Returns the path of the file.
+    """
+    texts_path = os.path.join(CACHE_DIR, f"{app_name}_{fingerprint}_texts.parquet")
+    if not os.path.exists(texts_path):
+        X.rename("text").reset_index(drop=True).to_frame().to_parquet(texts_path)
+    return texts_path
+
+
+def get_targets(y, w, app_name, fingerprint):
+    """
+    Stores the labels and sample weights of one app once, shared by every
+    cached matrix of that app. Returns the paths of both files.
+    """
+    labels_path = os.path.join(CACHE_DIR, f"{app_name}_{fingerprint}_labels.npy")
+    weights_path = os.path.join(CACHE_DIR, f"{app_name}_{fingerprint}_weights.npy")
+    if not os.path.exists(labels_path):
+        np.save(labels_path, y.to_numpy(dtype=str))
+    if not os.path.exists(weights_path):
+        np.save(weights_path, w.to_numpy(dtype=np.float64))
+    return labels_path, weights_path
+
+
+def save_matrix(matrix_path, X_matrix):
+    """
+    Stores a CSR matrix as raw .npy arrays (one per CSR component), so workers
+    can memory-map it instead of each loading a full copy.
+    The shape file is written last and marks a complete entry.
+    """
+    for component in ["data", "indices", "indptr"]:
+        np.save(f"{matrix_path}_{component}.npy", getattr(X_matrix, component))
+    with open(f"{matrix_path}_shape.json", "w") as f:
+        json.dump(list(X_matrix.shape), f)
+
+
+def load_matrix(matrix_path):
+    """Memory-maps a CSR matrix stored by save_matrix (read-only, no copy)."""
+    with open(f"{matrix_path}_shape.json") as f:
+        shape = tuple(json.load(f))
+    data, indices, indptr = (
+        np.load(f"{matrix_path}_{component}.npy", mmap_mode="r")
+        for component in ["data", "indices", "indptr"]
+    )
+    return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+def get_feature_matrix(
+    texts_path, train_idx, app_name, vectorizer_params, fingerprint, fold
+):
+    """
+    Vectorizes the reviews once per (configuration, fold) and stores the sparse
+    matrix on disk. The vocabulary and IDF are fitted on the fold's training
+    rows only, so validation rows never leak into the features. Values are
+    stored as float32 to halve the cache size (the shipped pipeline uses
+    float64; scores differ only by rounding). Every classifier setting reuses
+    the same matrix, and
+    later runs with the same data and settings load it instead of
+    re-vectorizing.
+    Runs inside a worker process, one job per (app, configuration, fold).
+    Returns the path prefix of the cached matrix (all rows of the app).
+    """
+    key = cache_key(app_name, vectorizer_params, fingerprint, fold)
+    matrix_path = os.path.join(CACHE_DIR, key)
+
+    if os.path.exists(f"{matrix_path}_shape.json"):
+        print(f"    [cache] {app_name} {vectorizer_params} fold {fold}")
+        return matrix_path
+
+    start = time.perf_counter()
+    X = pd.read_parquet(texts_path)["text"]
+    vectorizer = TfidfVectorizer(
+        max_features=vectorizer_params["max_features"],
+        ngram_range=tuple(vectorizer_params["ngram_range"]),
+        dtype=np.float32,
+    )
+    vectorizer.fit(X.iloc[train_idx])
+    X_matrix = vectorizer.transform(X).tocsr()
+    save_matrix(matrix_path, X_matrix)
+    print(
+        f"    [vectorized] {app_name} {vectorizer_params} fold {fold} -> {X_matrix.shape} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return matrix_path
+
+
+# ======================================================================================
+# Evaluation Worker
+# ======================================================================================
+def evaluate_fold(
+    matrix_path, labels_path, weights_path, train_idx, test_idx, classifier_params
+):
+    """
+    Fits a Logistic Regression on one fold of a cached feature matrix.
+    Runs inside a worker process, so only file paths and indices are sent over.
+    The cached matrix is memory-mapped: workers share its pages through the OS
+    cache and only copy the rows of the fold.
+    Rows are unique reviews, so both the fit and the metrics are weighted by the
+    duplicate counts to stay comparable with scores on the raw rows.
+
+    NOTE: tracemalloc only sees Python/NumPy allocations, not the native buffers
+    of the solver, so 'traced_peak_memory_mb' is a lower bound on fit memory.
+    """
+    X_matrix = load_matrix(matrix_path)
+    y = np.load(labels_path)
+    w = np.load(weights_path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    classifier = LogisticRegression(
+        max_iter=1000, random_state=RANDOM_STATE, **classifier_params
+    )
+    classifier.fit(X_matrix[train_idx], y[train_idx], sample_weight=w[train_idx])
+    fit_time = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    y_pred = classifier.predict(X_matrix[test_idx])
+    return {
+        "accuracy": accuracy_score(y[test_idx], y_pred, sample_weight=w[test_idx]),
+        "f1_macro": f1_score(
+            y[test_idx], y_pred, average="macro", sample_weight=w[test_idx]
+        ),
+        "fit_time_s": fit_time,
+        "traced_peak_memory_mb": peak_memory / 1024**2,
+        "matrix_memory_mb": (
+            X_matrix.data.nbytes + X_matrix.indices.nbytes + X_matrix.indptr.nbytes
+        )
+        / 1024**2,
+    }
+
+
+def expand_grid(grid):
+    """Expands a {param: [values]} dict into a list of parameter dicts."""
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+# ======================================================================================
+# Main Evaluation Flow
+# ======================================================================================
+def run_evaluation(df_model_data):
+    """
+    Runs stratified k-fold over the full hyperparameter grid for every app.
+    Returns a DataFrame with the mean/std of each metric per (app, configuration).
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    vectorizer_configs = expand_grid(VECTORIZER_GRID)
+    classifier_configs = expand_grid(CLASSIFIER_GRID)
+    skf = StratifiedKFold(n_splits=N_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+
+    # Evaluate on unique reviews weighted by their duplicate counts
+    df_train_data = deduplicate_reviews(df_model_data)
+    df_train_data = df_train_data[df_train_data["sample_weight"] > 0]
+    print(
+        f"Unique reviews after deduplication: {len(df_train_data)} "
+        f"(from {len(df_model_data)})"
+    )
+
+    # 1. One vectorization job per (app, vectorizer settings, fold)
+    jobs = []
+    for app_name in df_train_data["app_name"].unique():
+        app_df = df_train_data[df_train_data["app_name"] == app_name]
+        X_app = app_df["review_cleaned"].astype(str)
+        y_app = app_df["sentiment"]
+        w_app = app_df["sample_weight"]
+
+        fingerprint = data_fingerprint(X_app, y_app, w_app)
+        texts_path = get_texts(X_app, app_name, fingerprint)
+        labels_path, weights_path = get_targets(y_app, w_app, app_name, fingerprint)
+        folds = list(skf.split(np.zeros(len(y_app)), y_app))
+
+        for vectorizer_params in vectorizer_configs:
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                jobs.append(
+                    {
+                        "app_name": app_name,
+                        "vectorizer_params": vectorizer_params,
+                        "fingerprint": fingerprint,
+                        "fold": fold,
+                        "train_idx": train_idx,
+                        "test_idx": test_idx,
+                        "texts_path": texts_path,
+                        "labels_path": labels_path,
+                        "weights_path": weights_path,
+                    }
+                )
+
+    print(f"Preparing {len(jobs)} feature matrices across all cores...")
+    start = time.perf_counter()
+    matrix_paths = Parallel(n_jobs=N_JOBS, verbose=5)(
+        delayed(get_feature_matrix)(
+            job["texts_path"],
+            job["train_idx"],
+            job["app_name"],
+            job["vectorizer_params"],
+            job["fingerprint"],
+            job["fold"],
+        )
+        for job in jobs
+    )
+    print(f"Feature matrices ready in {time.perf_counter() - start:.1f}s")
+
+    # 2. Every classifier setting on top of every cached matrix
+    tasks = []
+    for job, matrix_path in zip(jobs, matrix_paths):
+        for classifier_params in classifier_configs:
+            meta = {
+                "app_name": job["app_name"],
+                "max_features": job["vectorizer_params"]["max_features"],
+                "ngram_min": job["vectorizer_params"]["ngram_range"][0],
+                "ngram_max": job["vectorizer_params"]["ngram_range"][1],
+                "C": classifier_params["C"],
+                "fold": job["fold"],
+            }
+            tasks.append(
+                (
+                    meta,
+                    (
+                        matrix_path,
+                        job["labels_path"],
+                        job["weights_path"],
+                        job["train_idx"],
+                        job["test_idx"],
+                        classifier_params,
+                    ),
+                )
+            )
+
+    print("-" * 50)
+    print(f"Running {len(tasks)} fold fits across all cores...")
+    start = time.perf_counter()
+    fold_results = Parallel(n_jobs=N_JOBS, verbose=5)(
+        delayed(evaluate_fold)(*args) for _, args in tasks
+    )
+    print(f"Evaluation finished in {time.perf_counter() - start:.1f}s")
+
+    fold_df = pd.DataFrame(
+        [{**meta, **result} for (meta, _), result in zip(tasks, fold_results)]
+    )
+    config_columns = ["app_name", "max_features", "ngram_min", "ngram_max", "C"]
+    summary_df = (
+        fold_df.drop(columns="fold")
+        .groupby(config_columns)
+        .agg(["mean", "std"])
+    )
+    summary_df.columns = [f"{metric}_{stat}" for metric, stat in summary_df.columns]
+    return summary_df.reset_index()
+
+
+def select_best_configs(summary_df):
+    """
+    Picks the configuration with the highest mean macro F1 for each app, in the
+    format read by preprocess_for_streamlit.py.
+    """
+    best_rows = summary_df.sort_values(
+        by=["f1_macro_mean", "fit_time_s_mean"], ascending=[False, True]
+    ).drop_duplicates(subset="app_name")
+
+    best_configs = {}
+    for _, row in best_rows.iterrows():
+        best_configs[row["app_name"]] = {
+            "max_features": int(row["max_features"]),
+            "ngram_range": [int(row["ngram_min"]), int(row["ngram_max"])],
+            "C": float(row["C"]),
+            "f1_macro": round(float(row["f1_macro_mean"]), 4),
+            "accuracy": round(float(row["accuracy_mean"]), 4),
+        }
+    return best_configs
+
+
+if __name__ == "__main__":
+    print("Starting cross-validated model evaluation...")
+
+    try:
+        df_cleaned = pd.read_parquet(INPUT_PATH)
+        print("Cleaned dataset loaded successfully.")
+    except FileNotFoundError:
+        print(
+            f"Error: '{INPUT_PATH}' not found. Please run the main analysis notebook first."
+        )
+        exit()
+
+    # Drop neutral reviews, exactly as done for the dashboard models
+    df_model_data = df_cleaned[df_cleaned["sentiment"] != "Netral"].copy()
+    print(f"Total reviews for evaluation: {len(df_model_data)}")
+    print("-" * 50)
+
+    summary_df = run_evaluation(df_model_data)
+    summary_df.to_parquet(RESULTS_PATH)
+
+    print("-" * 50)
+    print("Per-app results (sorted by macro F1):")
+    display_columns = [
+        "app_name",
+        "max_features",
+        "ngram_min",
+        "ngram_max",
+        "C",
+        "accuracy_mean",
+        "f1_macro_mean",
+        "fit_time_s_mean",
+        "traced_peak_memory_mb_mean",
+        "matrix_memory_mb_mean",
+    ]
+    print(
+        summary_df.sort_values(by=["app_name", "f1_macro_mean"], ascending=[True, False])[
+            display_columns
+        ].to_string(index=False)
+    )
+
+    best_configs = select_best_configs(summary_df)
+    with open(BEST_CONFIG_PATH, "w") as f:
+        json.dump(best_configs, f, indent=2)
+
+    print("=" * 60)
+    print("MODEL EVALUATION COMPLETED!")
+    print(f"Full results saved to: {RESULTS_PATH}")
+    print(f"Best configuration per app saved to: {BEST_CONFIG_PATH}")
+    for app_name, config in best_configs.items():
+        print(f"  {app_name}: {config}")
+    print("=" * 60)
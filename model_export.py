@@ -0,0 +1,280 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import re
+import time
+
+# ======================================================================================
+# Configuration
+# ======================================================================================
+# Exported models are directories of raw .npy arrays plus a small meta.json, so
+# the arrays can be memory-mapped on load: a cold load only reads the header,
+# and processes holding the same model share its pages through the OS cache.
+MODELS_DIR = "data/models"
+
+# pandas' hash_array needs a 16-character key. Terms are stored as 64-bit hashes
+# of this key instead of Python strings.
+HASH_KEY = "sentiment-vocab1"
+
+# Features with |coefficient| <= PRUNE_TOLERANCE lose their coefficient on export.
+# The default only drops exact zeros, so the export is lossless. A positive value
+# changes predictions and saves little: with l2 normalization (the default)
+# pruned terms still keep their hash and IDF as "norm-only" terms, since they
+# count towards each review's norm, so only their 4-byte coefficient is dropped.
+# For a genuinely smaller vocabulary, train with an L1/elasticnet penalty.
+PRUNE_TOLERANCE = 0.0
+
+# Exports are checked against the sklearn pipeline: any label difference, or a
+# positive-class probability gap above this bound, fails the export.
+MAX_PROBABILITY_GAP = 1e-6
+
+META_FILE = "meta.json"
+ARRAY_FILES = ["term_hashes", "idf", "coef", "norm_term_hashes", "norm_idf"]
+
+
+def hash_terms(terms, hash_key=HASH_KEY):
+    """Returns the uint64 hash of each term."""
+    return pd.util.hash_array(np.asarray(terms, dtype=object), hash_key=hash_key)
+
+
+# ======================================================================================
+# Export
+# ======================================================================================
+def export_model(
+    app_model,
+    directory,
+    tolerance=PRUNE_TOLERANCE,
+    check_texts=None,
+    max_gap=MAX_PROBABILITY_GAP,
+):
+    """
+    Saves a fitted TF-IDF + Logistic Regression pipeline in the compact format:
+    - the vocabulary as a sorted uint64 hash array (no Python dict/strings)
+    - float32 IDF and coefficient arrays
+    - features with |coefficient| <= tolerance lose their coefficient. With l2
+      normalization they are kept as (hash, idf) "norm-only" terms, because they
+      still contribute to each review's TF-IDF norm, so the vocabulary is NOT
+      pruned; only with norm=None are they dropped entirely.
+    When `check_texts` is given, the compact model is compared with `app_model`
+    on those texts before anything is written; a label difference or a
+    probability gap above `max_gap` raises ValueError.
+    """
+    vectorizer = app_model.named_steps["tfidf"]
+    classifier = app_model.named_steps["classifier"]
+
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer or vectorizer.preprocessor:
+        raise ValueError("Only the default word analyzer can be exported.")
+    if vectorizer.strip_accents is not None:
+        raise ValueError("Only strip_accents=None can be exported.")
+    if vectorizer.norm not in ("l2", None) or vectorizer.binary:
+        raise ValueError("Only norm='l2'/None with binary=False can be exported.")
+    if classifier.coef_.shape[0] != 1:
+        raise ValueError("Only binary classifiers can be exported.")
+
+    terms = vectorizer.get_feature_names_out()
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(terms))
+    coef = classifier.coef_[0]
+    hashes = hash_terms(terms)
+    if len(np.unique(hashes)) != len(hashes):
+        raise ValueError("Vocabulary hash collision; change HASH_KEY.")
+
+    keep = np.abs(coef) > tolerance
+    order = np.argsort(hashes[keep])
+    norm_only = ~keep if vectorizer.norm == "l2" else np.zeros_like(keep)
+    norm_order = np.argsort(hashes[norm_only])
+
+    arrays = {
+        "term_hashes": hashes[keep][order],
+        "idf": idf[keep][order].astype(np.float32),
+        "coef": coef[keep][order].astype(np.float32),
+        "norm_term_hashes": hashes[norm_only][norm_order],
+        "norm_idf": idf[norm_only][norm_order].astype(np.float32),
+    }
+    stop_words = vectorizer.get_stop_words()
+    meta = {
+        "classes": [str(c) for c in classifier.classes_],
+        "intercept": float(classifier.intercept_[0]),
+        "lowercase": vectorizer.lowercase,
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "norm": vectorizer.norm,
+        "hash_key": HASH_KEY,
+        "prune_tolerance": tolerance,
+        "n_features_original": len(terms),
+        "n_features_scoring": int(keep.sum()),
+        "n_features_norm_only": int(norm_only.sum()),
+    }
+
+    if check_texts is not None:
+        check_texts = [str(text) for text in check_texts]
+        compact_model = CompactSentimentModel(meta, arrays)
+        n_label_differences = int(
+            np.sum(compact_model.predict(check_texts) != app_model.predict(check_texts))
+        )
+        max_diff = max_probability_difference(app_model, compact_model, check_texts)
+        if n_label_differences or max_diff > max_gap:
+            raise ValueError(
+                f"Compact model differs from the sklearn model on {len(check_texts)} "
+                f"texts: {n_label_differences} label differences, max probability "
+                f"gap {max_diff:.2e} (bound {max_gap:.0e}). Lower the tolerance."
+            )
+        meta["n_checked_texts"] = len(check_texts)
+        meta["max_probability_gap"] = max_diff
+
+    os.makedirs(directory, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), values)
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# ======================================================================================
+# Compact Model
+# ======================================================================================
+class CompactSentimentModel:
+    """
+    Memory-mapped replacement for the exported sklearn pipeline at prediction
+    time. Scoring is pure NumPy: terms are hashed, looked up with searchsorted
+    and aggregated per review with bincount.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.classes = np.array(meta["classes"])
+        self.intercept = meta["intercept"]
+        self.term_hashes = arrays["term_hashes"]
+        self.idf = arrays["idf"]
+        self.coef = arrays["coef"]
+        self.norm_term_hashes = arrays["norm_term_hashes"]
+        self.norm_idf = arrays["norm_idf"]
+
+        self._token_pattern = re.compile(meta["token_pattern"])
+        self._stop_words = set(meta["stop_words"] or [])
+        self._min_n, self._max_n = meta["ngram_range"]
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_FILES
+        }
+        return cls(meta, arrays)
+
+    def _analyze(self, text):
+        """Same tokens and n-grams as TfidfVectorizer's default word analyzer."""
+        if self.meta["lowercase"]:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        if self._stop_words:
+            tokens = [token for token in tokens if token not in self._stop_words]
+        if self._max_n == 1:
+            return tokens
+
+        ngrams = list(tokens) if self._min_n == 1 else []
+        for n in range(max(self._min_n, 2), min(self._max_n, len(tokens)) + 1):
+            ngrams += [" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)]
+        return ngrams
+
+    @staticmethod
+    def _lookup(sorted_hashes, hashes):
+        """Returns the position of each hash in `sorted_hashes` and a found mask."""
+        if len(sorted_hashes) == 0:
+            return np.zeros(len(hashes), dtype=np.int64), np.zeros(len(hashes), bool)
+        positions = np.searchsorted(sorted_hashes, hashes)
+        positions = np.minimum(positions, len(sorted_hashes) - 1)
+        return positions, sorted_hashes[positions] == hashes
+
+    def decision_function(self, texts):
+        term_lists = [self._analyze(str(text)) for text in texts]
+        n_docs = len(term_lists)
+        lengths = np.array([len(terms) for terms in term_lists], dtype=np.int64)
+        doc_ids = np.repeat(np.arange(n_docs), lengths)
+        hashes = hash_terms(
+            [term for terms in term_lists for term in terms], self.meta["hash_key"]
+        )
+
+        # Map every term to a column: scoring terms first, then norm-only terms
+        n_scoring = len(self.term_hashes)
+        positions, found = self._lookup(self.term_hashes, hashes)
+        norm_positions, norm_found = self._lookup(self.norm_term_hashes, hashes)
+        columns = np.where(found, positions, n_scoring + norm_positions)
+        in_vocab = found | norm_found
+        doc_ids, columns = doc_ids[in_vocab], columns[in_vocab]
+
+        # Term counts per (review, column)
+        n_columns = n_scoring + len(self.norm_term_hashes)
+        keys, counts = np.unique(doc_ids * n_columns + columns, return_counts=True)
+        doc_ids, columns = keys // n_columns, keys % n_columns
+        tf = counts.astype(np.float64)
+        if self.meta["sublinear_tf"]:
+            tf = 1.0 + np.log(tf)
+
+        is_scoring = columns < n_scoring
+        idf = np.empty(len(columns), dtype=np.float64)
+        coef = np.zeros(len(columns), dtype=np.float64)
+        idf[is_scoring] = self.idf[columns[is_scoring]]
+        idf[~is_scoring] = self.norm_idf[columns[~is_scoring] - n_scoring]
+        coef[is_scoring] = self.coef[columns[is_scoring]]
+
+        tfidf = tf * idf
+        scores = np.bincount(doc_ids, weights=tfidf * coef, minlength=n_docs)
+        if self.meta["norm"] == "l2":
+            norms = np.sqrt(np.bincount(doc_ids, weights=tfidf**2, minlength=n_docs))
+            scores = scores / np.where(norms > 0, norms, 1.0)
+        return scores + self.intercept
+
+    def predict_proba(self, texts):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, texts):
+        return self.classes[(self.decision_function(texts) > 0).astype(int)]
+
+
+def load_models(models_dir=MODELS_DIR):
+    """Loads every exported model under `models_dir`, keyed by directory name."""
+    return {
+        name: CompactSentimentModel.load(os.path.join(models_dir, name))
+        for name in sorted(os.listdir(models_dir))
+        if os.path.exists(os.path.join(models_dir, name, META_FILE))
+    }
+
+
+def max_probability_difference(app_model, compact_model, texts):
+    """Largest absolute gap between sklearn and compact positive-class probabilities."""
+    expected = app_model.predict_proba(texts)[:, 1]
+    return float(np.max(np.abs(compact_model.predict_proba(texts)[:, 1] - expected)))
+
+
+if __name__ == "__main__":
+    print("Loading exported sentiment models...")
+
+    if not os.path.isdir(MODELS_DIR):
+        print(f"Error: '{MODELS_DIR}' not found. Please run the preprocessing script first.")
+        exit()
+
+    start = time.perf_counter()
+    models = load_models()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 60)
+    print(f"Loaded {len(models)} models in {elapsed_ms:.1f} ms")
+    for app_name, model in models.items():
+        meta = model.meta
+        size_kb = sum(
+            os.path.getsize(os.path.join(MODELS_DIR, app_name, f"{name}.npy"))
+            for name in ARRAY_FILES
+        ) / 1024
+        print(
+            f"  {app_name}: {meta['n_features_scoring']} scoring + "
+            f"{meta['n_features_norm_only']} norm-only features "
+            f"(of {meta['n_features_original']}, tolerance "
+            f"{meta.get('prune_tolerance', 0.0)}), {size_kb:.0f} KB"
+        )
+    print("=" * 60)
@@ -0,0 +1,331 @@
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import os
+import shutil
+import sys
+import time
+from scraping import REGISTRY_PATH, load_partitions, scrape_partition
+from text_cleaning import SUPPORTED_LANGUAGES, clean_reviews, load_stopwords
+from deduplication import deduplicate_reviews
+from term_statistics import compute_top_terms, iter_dataframe_chunks
+from model_export import MODELS_DIR, PRUNE_TOLERANCE, export_model
+from preprocess_for_streamlit import (
+    build_aspect_plot_df,
+    build_feature_importance,
+    load_best_configs,
+    train_app_model,
+)
+
+# ======================================================================================
+# Configuration
+# ======================================================================================
+# Every (market, app) partition gets its own directory, and every stage reads
+# the previous stage's file from it. Partitions never read each other's files,
+# so they can run in parallel and any partition/stage can be re-run on its own.
+PARTITIONS_DIR = "data/partitions"
+OUTPUT_DIR = "data"
+
+STAGES = ["scrape", "clean", "model", "aggregate"]
+
+# Scraping hits Google Play and the App Store, so it runs in its own phase with
+# few workers (default 1) and a pause after each partition, to be polite to the
+# servers. The CPU-bound stages then run with the full worker pool.
+SCRAPE_WORKERS = 1
+SCRAPE_DELAY_S = 10
+
+# The dashboard shows one market at a time (labels and stopwords are Indonesian)
+DASHBOARD_MARKET = "id"
+
+RAW_FILE = "app_reviews.parquet"
+CLEANED_FILE = "app_reviews_cleaned.parquet"
+FEATURE_IMPORTANCE_FILE = "feature_importance.parquet"
+ASPECT_FILE = "aspect_plot_df.parquet"
+TOP_TERMS_FILE = "top_terms.parquet"
+MODEL_DIR = "model"
+
+
+def partition_dir(partition):
+    return os.path.join(PARTITIONS_DIR, partition["market"], partition["app_name"])
+
+
+def load_model_data(directory):
+    """Loads a partition's cleaned reviews without neutral sentiment."""
+    df_cleaned = pd.read_parquet(os.path.join(directory, CLEANED_FILE))
+    return df_cleaned[df_cleaned["sentiment"] != "Netral"]
+
+
+# ======================================================================================
+# Partition Stages
+# ======================================================================================
+def run_scrape(partition, directory):
+    df_reviews = scrape_partition(partition)
+    if df_reviews is None:
+        raise RuntimeError("no reviews were collected")
+    df_reviews.to_parquet(os.path.join(directory, RAW_FILE))
+    # A short delay before this worker scrapes the next partition
+    time.sleep(SCRAPE_DELAY_S)
+
+
+def run_clean(partition, directory):
+    df_reviews = pd.read_parquet(os.path.join(directory, RAW_FILE))
+    # Stopwords are loaded by the parent process (see attach_stopwords)
+    df_cleaned = clean_reviews(
+        df_reviews,
+        language=partition["language"],
+        stop_words=partition.get("stop_words"),
+    )
+    df_cleaned.to_parquet(os.path.join(directory, CLEANED_FILE))
+
+
+def run_model(partition, directory):
+    df_train_data = deduplicate_reviews(load_model_data(directory))
+    df_train_data = df_train_data[df_train_data["sample_weight"] > 0]
+
+    # evaluate_models.py tunes the configs on the dashboard market's reviews and
+    # keys them by app name only, so other markets use the baseline config.
+    app_config = None
+    if partition["market"] == DASHBOARD_MARKET:
+        app_config = load_best_configs(OUTPUT_DIR).get(partition["app_name"])
+    app_model = train_app_model(df_train_data, app_config)
+    build_feature_importance(app_model).to_parquet(
+        os.path.join(directory, FEATURE_IMPORTANCE_FILE)
+    )
+
+    # Compact model, checked against the sklearn model on all training reviews
+    meta = export_model(
+        app_model,
+        os.path.join(directory, MODEL_DIR),
+        tolerance=PRUNE_TOLERANCE,
+        check_texts=df_train_data["review_cleaned"],
+    )
+    print(
+        f"    [{partition['market']}] {partition['app_name']}: "
+        f"{meta['n_features_scoring']} of {meta['n_features_original']} features "
+        f"scored, max probability gap {meta['max_probability_gap']:.2e} "
+        f"on {meta['n_checked_texts']} reviews"
+    )
+
+
+def run_aggregate(partition, directory):
+    df_model_data = load_model_data(directory)
+    build_aspect_plot_df(df_model_data).to_parquet(os.path.join(directory, ASPECT_FILE))
+    compute_top_terms(iter_dataframe_chunks(df_model_data)).to_parquet(
+        os.path.join(directory, TOP_TERMS_FILE)
+    )
+
+
+STAGE_FUNCTIONS = {
+    "scrape": run_scrape,
+    "clean": run_clean,
+    "model": run_model,
+    "aggregate": run_aggregate,
+}
+
+
+def run_partition(partition, stages):
+    """
+    Runs the requested stages for one (market, app) partition, in order.
+    Runs inside a worker process; errors are returned instead of raised so one
+    failing partition does not stop the others.
+    """
+    directory = partition_dir(partition)
+    os.makedirs(directory, exist_ok=True)
+    result = {
+        "market": partition["market"],
+        "app_name": partition["app_name"],
+        "status": "ok",
+    }
+
+    start = time.perf_counter()
+    for stage in stages:
+        try:
+            STAGE_FUNCTIONS[stage](partition, directory)
+        except Exception as e:
+            result["status"] = f"failed at '{stage}': {e}"
+            break
+    result["elapsed_s"] = round(time.perf_counter() - start, 1)
+    return result
+
+
+# ======================================================================================
+# Dashboard Artifacts
+# ======================================================================================
+def publish_dashboard_artifacts(partitions, market=DASHBOARD_MARKET):
+    """
+    Updates the dashboard files from the per-partition outputs of one market.
+    Per-app files (feature importance, compact model) are copied as they are.
+    The combined aspect and top-terms files are only rewritten when every
+    registry partition of the market has produced its file; otherwise the
+    existing dashboard file is kept and a warning is printed.
+    The cleaned reviews are not combined here: the dashboard reads them from S3.
+    """
+    market_partitions = [p for p in partitions if p["market"] == market]
+
+    for partition in market_partitions:
+        directory = partition_dir(partition)
+        app_name = partition["app_name"]
+
+        fi_path = os.path.join(directory, FEATURE_IMPORTANCE_FILE)
+        if os.path.exists(fi_path):
+            shutil.copyfile(
+                fi_path,
+                os.path.join(OUTPUT_DIR, f"feature_importance_{app_name}.parquet"),
+            )
+        model_path = os.path.join(directory, MODEL_DIR)
+        if os.path.isdir(model_path):
+            shutil.copytree(
+                model_path, os.path.join(MODELS_DIR, app_name), dirs_exist_ok=True
+            )
+
+    for file_name in [ASPECT_FILE, TOP_TERMS_FILE]:
+        paths = [os.path.join(partition_dir(p), file_name) for p in market_partitions]
+        missing = [
+            p["app_name"]
+            for p, path in zip(market_partitions, paths)
+            if not os.path.exists(path)
+        ]
+        output_path = os.path.join(OUTPUT_DIR, file_name)
+        if missing:
+            print(
+                f"Warning: '{output_path}' was not updated; partitions without "
+                f"'{file_name}': {', '.join(missing)}. Run their 'aggregate' stage first."
+            )
+            continue
+        combined = pd.concat([pd.read_parquet(path) for path in paths])
+        combined.reset_index(drop=True).to_parquet(output_path)
+        print(f"File '{output_path}' saved ({len(paths)} partitions).")
+
+
+def attach_stopwords(partitions):
+    """
+    Loads the stopwords of every supported partition language once, in the
+    parent process, and attaches them to the partitions. This way the 'clean'
+    workers never download NLTK data themselves (parallel downloads into the
+    same nltk_data directory can corrupt it). Unsupported languages are left
+    out; their 'clean' stage fails with a clear error.
+    """
+    languages = {p["language"] for p in partitions} & set(SUPPORTED_LANGUAGES)
+    stop_words = {language: load_stopwords(language) for language in languages}
+    return [{**p, "stop_words": stop_words.get(p["language"])} for p in partitions]
+
+
+def run_phase(partitions, stages, workers):
+    """Runs `stages` for every partition in a pool of `workers` processes."""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_partition, partition, stages) for partition in partitions
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(
+                f"--> [{result['market']}] {result['app_name']}: "
+                f"{result['status']} ({result['elapsed_s']}s)"
+            )
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run the scrape -> clean -> model -> aggregate pipeline per (market, app) partition."
+    )
+    parser.add_argument("--registry", default=REGISTRY_PATH)
+    parser.add_argument(
+        "--market", nargs="+", help="Only run these markets (default: all)."
+    )
+    parser.add_argument("--app", nargs="+", help="Only run these apps (default: all).")
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=STAGES,
+        help="Stages to run, in pipeline order (default: all).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of partitions processed in parallel.",
+    )
+    parser.add_argument(
+        "--scrape-workers",
+        type=int,
+        default=SCRAPE_WORKERS,
+        help="Number of partitions scraped at the same time (keep this low).",
+    )
+    parser.add_argument(
+        "--no-publish",
+        action="store_true",
+        help="Skip combining partition outputs into the dashboard files.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stages = [stage for stage in STAGES if stage in args.stages]
+
+    all_partitions = load_partitions(args.registry)
+    partitions = [
+        p
+        for p in all_partitions
+        if (not args.market or p["market"] in args.market)
+        and (not args.app or p["app_name"] in args.app)
+    ]
+    if not partitions:
+        print("No partitions match the selected markets/apps. The process is stopping.")
+        exit()
+
+    start = time.perf_counter()
+    results = []
+
+    # Phase 1: scraping, with a small number of workers
+    if "scrape" in stages:
+        print(
+            f"Scraping {len(partitions)} partitions "
+            f"with {args.scrape_workers} workers..."
+        )
+        print("-" * 50)
+        scrape_results = run_phase(partitions, ["scrape"], args.scrape_workers)
+        stages = [stage for stage in stages if stage != "scrape"]
+
+        # Partitions that failed to scrape are not processed any further
+        scraped = {
+            (r["market"], r["app_name"]) for r in scrape_results if r["status"] == "ok"
+        }
+        partitions = [p for p in partitions if (p["market"], p["app_name"]) in scraped]
+        results += [
+            r
+            for r in scrape_results
+            if not stages or (r["market"], r["app_name"]) not in scraped
+        ]
+
+    # Phase 2: CPU-bound stages, with the full worker pool
+    if stages and partitions:
+        if "clean" in stages:
+            partitions = attach_stopwords(partitions)
+        print("-" * 50)
+        print(
+            f"Running stages {stages} for {len(partitions)} partitions "
+            f"with {args.workers} workers..."
+        )
+        print("-" * 50)
+        results += run_phase(partitions, stages, args.workers)
+
+    if not args.no_publish:
+        print("-" * 50)
+        print(f"Publishing dashboard files for market '{DASHBOARD_MARKET}'...")
+        publish_dashboard_artifacts(all_partitions)
+
+    n_failed = sum(result["status"] != "ok" for result in results)
+    print("=" * 60)
+    print("PIPELINE RUN COMPLETED!")
+    print(f"Partitions: {len(results)} ({n_failed} failed)")
+    print(f"Elapsed time: {time.perf_counter() - start:.1f}s")
+    print("=" * 60)
+
+    # A non-zero exit status lets schedulers/CI notice failed partitions
+    if n_failed:
+        sys.exit(1)
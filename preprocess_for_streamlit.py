@@ -3,63 +3,163 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
+import json
 import os
-
-print("Memulai proses pra-pemrosesan untuk aplikasi Streamlit...")
+from term_statistics import compute_top_terms, iter_dataframe_chunks
+from deduplication import deduplicate_reviews
+from model_export import MODELS_DIR, PRUNE_TOLERANCE, export_model
 
 # =====================================================================
-# 1. Persiapan Direktori dan Data Awal
+# Fungsi-fungsi Pra-pemrosesan
 # =====================================================================
+# Fungsi di bawah ini juga dipakai oleh pipeline.py untuk memproses
+# setiap partisi (market, aplikasi) secara terpisah
 
-# Pastikan direktori 'data' ada
-output_dir = "data"
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-    print(f"Direktori '{output_dir}' telah dibuat.")
-
-# Muat dataset yang sudah dibersihkan dari notebook Anda
-# Pastikan file ini ada di path yang benar
-try:
-    df_cleaned = pd.read_parquet("data/app_reviews_cleaned.parquet")
-    print("Dataset yang sudah dibersihkan berhasil dimuat.")
-except FileNotFoundError:
-    print(
-        "Error: File 'app_reviews_cleaned.parquet' tidak ditemukan. Pastikan Anda sudah menjalankannya dari notebook analisis utama."
-    )
-    exit()
-
-# Buang ulasan netral untuk pemodelan
-df_model_data = df_cleaned[df_cleaned["sentiment"] != "Netral"].copy()
-print(f"Total ulasan untuk diproses: {len(df_model_data)}")
-print("-" * 50)
-
+# Kata kunci untuk analisis aspek, diambil dari notebook analisis aspek Anda
+ASPECT_KEYWORDS = {
+    "Aplikasi": [
+        "aplikasi",
+        "apk",
+        "app",
+        "update",
+        "eror",
+        "error",
+        "lambat",
+        "lemot",
+        "boikot",
+        "peta",
+        "lokasi",
+        "gps",
+        "susah",
+        "mudah",
+        "uninstall",
+        "bobrok",
+        "notifikasi",
+        "iklan",
+        "sistem",
+    ],
+    "Harga": [
+        "harga",
+        "terjangkau",
+        "tarif",
+        "mahal",
+        "murah",
+        "promo",
+        "diskon",
+        "biaya",
+        "ongkir",
+        "poin",
+        "poinnya",
+    ],
+    "Pengemudi": [
+        "pengemudi",
+        "driver",
+        "drivernya",
+        "ramah",
+        "sopan",
+        "kasar",
+        "ugal",
+        "baik",
+        "batal",
+        "cancel",
+        "ngebut",
+    ],
+    "Layanan": [
+        "layanan",
+        "payah",
+        "grab",
+        "pertahankan",
+        "cepat",
+        "lama",
+        "order",
+        "jemput",
+        "antar",
+        "makanan",
+        "gojek",
+        "grab",
+        "maxim",
+        "indrive",
+        "pesan",
+        "pesanan",
+        "gofood",
+        "go food",
+        "pelayanan",
+        "cepat",
+        "kasar",
+        "pendukung",
+        "sampah",
+        "parah",
+        "buruk",
+        "terbaik",
+        "best",
+        "keren",
+    ],
+    "Customer Service": [
+        "cs",
+        "customer",
+        "service",
+        "bantuan",
+        "pusat bantuan",
+        "komplain",
+        "laporan",
+        "pengaduan",
+        "respon",
+        "solusi",
+        "ganti rugi",
+        "lambar",
+        "balas",
+    ],
+}
 
-# =====================================================================
-# 2. Membuat File Feature Importance untuk Setiap Aplikasi
-# =====================================================================
 
-print("Memulai pembuatan file 'feature importance' untuk setiap aplikasi...")
-app_names = df_model_data["app_name"].unique()
+def load_best_configs(output_dir="data"):
+    """
+    Memuat konfigurasi terbaik per aplikasi hasil evaluate_models.py.
+    Mengembalikan dict kosong jika file belum ada (konfigurasi baseline dipakai).
+    """
+    best_config_path = os.path.join(output_dir, "best_model_config.json")
+    if not os.path.exists(best_config_path):
+        return {}
+    with open(best_config_path) as f:
+        best_configs = json.load(f)
+    print(f"Konfigurasi model dimuat dari '{best_config_path}'.")
+    return best_configs
 
-for app_name in app_names:
-    print(f"--> Memproses: {app_name.capitalize()}")
 
-    # Filter data untuk aplikasi saat ini
-    app_df = df_model_data[df_model_data["app_name"] == app_name]
+def train_app_model(app_df, app_config=None):
+    """
+    Melatih pipeline TF-IDF + Logistic Regression untuk satu aplikasi.
+    `app_df` berisi ulasan unik hasil deduplicate_reviews (kolom 'sample_weight').
+    """
+    app_config = app_config or {}
 
     X_app = app_df["review_cleaned"].astype(str)
     y_app = app_df["sentiment"]
+    w_app = app_df["sample_weight"]
 
-    # Latih model baru khusus untuk aplikasi ini
     app_model = Pipeline(
         [
-            ("tfidf", TfidfVectorizer(max_features=5000)),
-            ("classifier", LogisticRegression(max_iter=1000, random_state=42)),
+            (
+                "tfidf",
+                TfidfVectorizer(
+                    max_features=app_config.get("max_features", 5000),
+                    ngram_range=tuple(app_config.get("ngram_range", (1, 1))),
+                ),
+            ),
+            (
+                "classifier",
+                LogisticRegression(
+                    C=app_config.get("C", 1.0), max_iter=1000, random_state=42
+                ),
+            ),
         ]
     )
-    app_model.fit(X_app, y_app)
+    app_model.fit(X_app, y_app, classifier__sample_weight=w_app)
+    return app_model
 
-    # Ekstrak feature importance
+
+def build_feature_importance(app_model, top_n=15):
+    """Mengambil `top_n` kata kunci teratas untuk masing-masing sentimen."""
     vectorizer = app_model.named_steps["tfidf"]
     classifier = app_model.named_steps["classifier"]
     feature_names = vectorizer.get_feature_names_out()
@@ -69,141 +169,31 @@ for app_name in app_names:
         {"word": feature_names, "coefficient": coefficients}
     ).sort_values(by="coefficient", ascending=False)
 
-    # Ambil 15 kata kunci teratas untuk masing-masing sentimen
-    top_positive_keywords = coef_df.head(15).copy()
+    top_positive_keywords = coef_df.head(top_n).copy()
     top_positive_keywords["sentiment"] = "Positif"
 
     top_negative_keywords = (
-        coef_df.tail(15).sort_values(by="coefficient", ascending=True).copy()
+        coef_df.tail(top_n).sort_values(by="coefficient", ascending=True).copy()
     )
     top_negative_keywords["sentiment"] = "Negatif"
 
     # Gabungkan menjadi satu DataFrame
-    feature_importance_df = pd.concat(
-        [top_positive_keywords, top_negative_keywords], ignore_index=True
-    )
+    return pd.concat([top_positive_keywords, top_negative_keywords], ignore_index=True)
 
-    # Simpan ke file parquet
-    file_path = os.path.join(output_dir, f"feature_importance_{app_name}.parquet")
-    feature_importance_df.to_parquet(file_path)
-    print(f"    File '{file_path}' berhasil disimpan.")
 
-print("-" * 50)
-print("Semua file 'feature importance' telah berhasil dibuat.")
+def tag_aspect(review):
+    found_aspects = []
+    words = str(review).split()
+    for aspect, keywords in ASPECT_KEYWORDS.items():
+        if any(keyword in words for keyword in keywords):
+            found_aspects.append(aspect)
+    if not found_aspects:
+        return ["Umum"]
+    return found_aspects
 
 
-# =====================================================================
-# 3. (Opsional) Jika Anda belum membuat file aspect_plot_df.parquet
-# =====================================================================
-# Kode ini diambil dari notebook analisis aspek Anda
-
-print("\nMembuat file untuk plot analisis aspek...")
-try:
-    aspect_keywords = {
-        "Aplikasi": [
-            "aplikasi",
-            "apk",
-            "app",
-            "update",
-            "eror",
-            "error",
-            "lambat",
-            "lemot",
-            "boikot",
-            "peta",
-            "lokasi",
-            "gps",
-            "susah",
-            "mudah",
-            "uninstall",
-            "bobrok",
-            "notifikasi",
-            "iklan",
-            "sistem",
-        ],
-        "Harga": [
-            "harga",
-            "terjangkau",
-            "tarif",
-            "mahal",
-            "murah",
-            "promo",
-            "diskon",
-            "biaya",
-            "ongkir",
-            "poin",
-            "poinnya",
-        ],
-        "Pengemudi": [
-            "pengemudi",
-            "driver",
-            "drivernya",
-            "ramah",
-            "sopan",
-            "kasar",
-            "ugal",
-            "baik",
-            "batal",
-            "cancel",
-            "ngebut",
-        ],
-        "Layanan": [
-            "layanan",
-            "payah",
-            "grab",
-            "pertahankan",
-            "cepat",
-            "lama",
-            "order",
-            "jemput",
-            "antar",
-            "makanan",
-            "gojek",
-            "grab",
-            "maxim",
-            "indrive",
-            "pesan",
-            "pesanan",
-            "gofood",
-            "go food",
-            "pelayanan",
-            "cepat",
-            "kasar",
-            "pendukung",
-            "sampah",
-            "parah",
-            "buruk",
-            "terbaik",
-            "best",
-            "keren",
-        ],
-        "Customer Service": [
-            "cs",
-            "customer",
-            "service",
-            "bantuan",
-            "pusat bantuan",
-            "komplain",
-            "laporan",
-            "pengaduan",
-            "respon",
-            "solusi",
-            "ganti rugi",
-            "lambar",
-            "balas",
-        ],
-    }
-
-    def tag_aspect(review):
-        found_aspects = []
-        words = str(review).split()
-        for aspect, keywords in aspect_keywords.items():
-            if any(keyword in words for keyword in keywords):
-                found_aspects.append(aspect)
-        if not found_aspects:
-            return ["Umum"]
-        return found_aspects
-
+def build_aspect_plot_df(df_model_data):
+    """Menghitung persentase sentimen per (aplikasi, aspek) untuk plot aspek."""
     df_aspect = df_model_data.copy()
     df_aspect["aspects"] = df_aspect["review_cleaned"].apply(tag_aspect)
     df_exploded = df_aspect.explode("aspects")
@@ -215,18 +205,120 @@ try:
     aspect_percentage = aspect_summary.div(
         aspect_summary.sum(axis=1), axis=0
     ).reset_index()
-    aspect_plot_df = aspect_percentage.melt(
+    return aspect_percentage.melt(
         id_vars=["app_name", "aspects"],
         value_vars=["Positif", "Negatif"],
         var_name="sentiment",
         value_name="percentage",
     )
 
-    aspect_file_path = os.path.join(output_dir, "aspect_plot_df.parquet")
-    aspect_plot_df.to_parquet(aspect_file_path)
-    print(f"File '{aspect_file_path}' berhasil disimpan.")
 
-except Exception as e:
-    print(f"Gagal membuat file analisis aspek: {e}")
+if __name__ == "__main__":
+    print("Memulai proses pra-pemrosesan untuk aplikasi Streamlit...")
+
+    # =====================================================================
+    # 1. Persiapan Direktori dan Data Awal
+    # =====================================================================
+
+    # Pastikan direktori 'data' ada
+    output_dir = "data"
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Direktori '{output_dir}' telah dibuat.")
+
+    # Muat dataset yang sudah dibersihkan dari notebook Anda
+    # Pastikan file ini ada di path yang benar
+    try:
+        df_cleaned = pd.read_parquet("data/app_reviews_cleaned.parquet")
+        print("Dataset yang sudah dibersihkan berhasil dimuat.")
+    except FileNotFoundError:
+        print(
+            "Error: File 'app_reviews_cleaned.parquet' tidak ditemukan. Pastikan Anda sudah menjalankannya dari notebook analisis utama."
+        )
+        exit()
+
+    # Buang ulasan netral untuk pemodelan
+    df_model_data = df_cleaned[df_cleaned["sentiment"] != "Netral"].copy()
+    print(f"Total ulasan untuk diproses: {len(df_model_data)}")
+
+    # Kelompokkan ulasan duplikat/hampir duplikat (mis. "top", "mantap") agar model
+    # dilatih pada ulasan unik dengan bobot sesuai jumlah duplikatnya
+    df_train_data = deduplicate_reviews(df_model_data)
+    df_train_data = df_train_data[df_train_data["sample_weight"] > 0]
+    print(f"Total ulasan unik untuk pelatihan model: {len(df_train_data)}")
+    print("-" * 50)
+
+    # =====================================================================
+    # 2. Membuat File Feature Importance untuk Setiap Aplikasi
+    # =====================================================================
+
+    print("Memulai pembuatan file 'feature importance' untuk setiap aplikasi...")
+    app_names = df_model_data["app_name"].unique()
+
+    # Gunakan konfigurasi terbaik hasil evaluate_models.py jika tersedia,
+    # jika tidak gunakan konfigurasi baseline dari notebook
+    best_configs = load_best_configs(output_dir)
+
+    for app_name in app_names:
+        print(f"--> Memproses: {app_name.capitalize()}")
+
+        # Latih model baru khusus untuk aplikasi ini
+        app_df = df_train_data[df_train_data["app_name"] == app_name]
+        app_model = train_app_model(app_df, best_configs.get(app_name))
+
+        # Ekstrak feature importance dan simpan ke file parquet
+        feature_importance_df = build_feature_importance(app_model)
+        file_path = os.path.join(output_dir, f"feature_importance_{app_name}.parquet")
+        feature_importance_df.to_parquet(file_path)
+        print(f"    File '{file_path}' berhasil disimpan.")
+
+        # Ekspor model ringkas (float32, memory-mapped) untuk proses scoring/dashboard
+        model_path = os.path.join(MODELS_DIR, app_name)
+        # Model ringkas dicek terhadap model sklearn pada semua ulasan latih
+        meta = export_model(
+            app_model,
+            model_path,
+            tolerance=PRUNE_TOLERANCE,
+            check_texts=app_df["review_cleaned"],
+        )
+        print(
+            f"    Model ringkas disimpan di '{model_path}': "
+            f"{meta['n_features_scoring']} dari {meta['n_features_original']} fitur "
+            f"dengan koefisien, selisih probabilitas maks. pada "
+            f"{meta['n_checked_texts']} ulasan: {meta['max_probability_gap']:.2e}."
+        )
+
+    print("-" * 50)
+    print("Semua file 'feature importance' telah berhasil dibuat.")
+
+    # =====================================================================
+    # 3. (Opsional) Jika Anda belum membuat file aspect_plot_df.parquet
+    # =====================================================================
+
+    print("\nMembuat file untuk plot analisis aspek...")
+    try:
+        aspect_plot_df = build_aspect_plot_df(df_model_data)
+        aspect_file_path = os.path.join(output_dir, "aspect_plot_df.parquet")
+        aspect_plot_df.to_parquet(aspect_file_path)
+        print(f"File '{aspect_file_path}' berhasil disimpan.")
+
+    except Exception as e:
+        print(f"Gagal membuat file analisis aspek: {e}")
+
+    # =====================================================================
+    # 4. Statistik N-gram (Unigram & Bigram) per Aplikasi, Sentimen, dan Bulan
+    # =====================================================================
+    # Dihitung secara streaming per potongan data dengan count-min sketch,
+    # sehingga dashboard bisa menampilkan word cloud tanpa memuat teks mentah
+
+    print("\nMembuat file statistik n-gram teratas...")
+    try:
+        top_terms_df = compute_top_terms(iter_dataframe_chunks(df_model_data))
+        top_terms_file_path = os.path.join(output_dir, "top_terms.parquet")
+        top_terms_df.to_parquet(top_terms_file_path)
+        print(f"File '{top_terms_file_path}' berhasil disimpan.")
+
+    except Exception as e:
+        print(f"Gagal membuat file statistik n-gram: {e}")
 
-print("\nPra-pemrosesan data untuk Streamlit selesai!")
+    print("\nPra-pemrosesan data untuk Streamlit selesai!")
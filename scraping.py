@@ -0,0 +1,156 @@
+import pandas as pd
+import json
+
+# ======================================================================================
+# App Registry
+# ======================================================================================
+# The apps and markets to scrape live in an external JSON registry, so adding an
+# app or a market does not require touching the code.
+# App Store ID can be found in the App Store URL.
+# e.g., for Gojek: apps.apple.com/id/app/gojek/id944875099 -> the ID is 944875099
+# Note that App Store names/IDs can differ per country, so they are set per market.
+REGISTRY_PATH = "apps_registry.json"
+
+# Configure the maximum number of reviews to scrape per app, per platform.
+MAX_REVIEWS_PER_APP = 500000
+
+OUTPUT_COLUMNS = [
+    "market",
+    "app_name",
+    "platform",
+    "date",
+    "user_name",
+    "rating",
+    "review_content",
+]
+
+
+def load_partitions(registry_path=REGISTRY_PATH):
+    """
+    Reads the app registry and returns one partition dict per (market, app):
+    {"market", "country", "language", "app_name", "app_details"}.
+    """
+    with open(registry_path) as f:
+        registry = json.load(f)
+
+    partitions = []
+    for market in registry["markets"]:
+        for app_name, app_details in market["apps"].items():
+            partitions.append(
+                {
+                    "market": market["market"],
+                    "country": market["country"],
+                    "language": market["language"],
+                    "app_name": app_name,
+                    "app_details": app_details,
+                }
+            )
+    return partitions
+
+
+# ======================================================================================
+# Scraping Functions
+# ======================================================================================
+def scrape_play_store(partition, max_reviews=MAX_REVIEWS_PER_APP):
+    """Fetches the newest Google Play reviews of one partition's app."""
+    # Imported here so the non-scraping pipeline stages work without the scrapers
+    from google_play_scraper import reviews, Sort
+
+    # We use 'reviews' instead of 'reviews_all' to limit the results with 'count'
+    # and prevent excessively long scraping times.
+    play_store_reviews, continuation_token = reviews(
+        partition["app_details"]["play_store_id"],
+        lang=partition["language"],
+        country=partition["country"],
+        sort=Sort.NEWEST,  # Sort by newest reviews
+        count=max_reviews,
+        filter_score_with=None,  # Fetch reviews of all ratings
+    )
+
+    # Create a DataFrame and standardize the columns
+    df_play = pd.DataFrame(play_store_reviews)
+    df_play["platform"] = "Google Play"
+    return df_play[["userName", "content", "score", "at", "platform"]].rename(
+        columns={
+            "userName": "user_name",
+            "content": "review_content",
+            "score": "rating",
+            "at": "date",
+        }
+    )
+
+
+def scrape_app_store(partition, max_reviews=MAX_REVIEWS_PER_APP):
+    """
+    Fetches Apple App Store reviews of one partition's app.
+    Returns None when the scraper comes back empty.
+    """
+    from app_store_scraper import AppStore
+
+    app_store_scraper = AppStore(
+        country=partition["country"],
+        app_name=partition["app_details"]["app_store_name"],
+        app_id=partition["app_details"]["app_store_id"],
+    )
+    app_store_scraper.review(how_many=max_reviews)
+    app_store_reviews = app_store_scraper.reviews
+
+    # ADDED ROBUSTNESS: Check if reviews were actually fetched before processing
+    if not app_store_reviews:
+        return None
+
+    # Create a DataFrame and standardize the columns
+    df_appstore = pd.DataFrame(app_store_reviews)
+    df_appstore["platform"] = "App Store"
+    return df_appstore[["userName", "review", "rating", "date", "platform"]].rename(
+        columns={
+            "userName": "user_name",
+            "review": "review_content",
+            # 'rating' column name is already consistent
+            "date": "date",
+        }
+    )
+
+
+def scrape_partition(partition, max_reviews=MAX_REVIEWS_PER_APP):
+    """
+    Scrapes both stores for one (market, app) partition.
+    A failure on one store is reported and does not stop the other.
+    Returns the combined reviews, or None if nothing was collected.
+    """
+    label = f"{partition['app_name'].capitalize()} [{partition['market']}]"
+    reviews_list = []
+
+    # 1. Scraping from Google Play Store
+    print(f"  -> {label}: fetching from Google Play Store...")
+    try:
+        df_play = scrape_play_store(partition, max_reviews)
+        reviews_list.append(df_play)
+        print(f"     {label}: fetched {len(df_play)} reviews from Google Play Store.")
+    except Exception as e:
+        print(f"     {label}: failed to fetch from Google Play Store. Error: {e}")
+
+    # 2. Scraping from Apple App Store
+    print(f"  -> {label}: fetching from Apple App Store...")
+    try:
+        df_appstore = scrape_app_store(partition, max_reviews)
+        if df_appstore is None:
+            print(
+                f"     {label}: no reviews were fetched from App Store. This might be a temporary issue or an API change. Skipping."
+            )
+        else:
+            reviews_list.append(df_appstore)
+            print(f"     {label}: fetched {len(df_appstore)} reviews from App Store.")
+    except Exception as e:
+        # This will catch any other unexpected errors during the App Store process
+        print(f"     {label}: failed to process reviews from App Store. Error: {e}")
+
+    if not reviews_list:
+        return None
+
+    df_reviews = pd.concat(reviews_list, ignore_index=True)
+    df_reviews["market"] = partition["market"]
+    df_reviews["app_name"] = partition["app_name"]
+    # Convert the 'date' column to a consistent datetime format
+    df_reviews["date"] = pd.to_datetime(df_reviews["date"])
+    return df_reviews[OUTPUT_COLUMNS]
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from wordcloud import WordCloud
 
 # ======================================================================================
 # Page Configuration
@@ -84,7 +85,20 @@ def load_data():
         return None, None, None
 
 
+@st.cache_data
+def load_top_terms():
+    """
+    Loads the pre-computed top unigrams/bigrams per app, sentiment and month
+    (generated by the preprocessing script). Returns None if it is missing.
+    """
+    try:
+        return pd.read_parquet("data/top_terms.parquet")
+    except FileNotFoundError:
+        return None
+
+
 df_cleaned, df_model_data, aspect_plot_df = load_data()
+top_terms_df = load_top_terms()
 
 
 # ======================================================================================
@@ -142,12 +156,13 @@ st.markdown(
 
 
 # --- Create Tabs for different sections ---
-tab1, tab2, tab3, tab4 = st.tabs(
+tab1, tab2, tab3, tab4, tab5 = st.tabs(
     [
         "📊 Data Distribution",
         "📈 Time-Series Analysis",
         "🔑 Key Driver Analysis",
         "🧩 Aspect-Based Analysis",
+        "☁️ Top Terms",
     ]
 )
 
@@ -366,6 +381,59 @@ with tab4:
         )
 
 
+# ======================================================================================
+# Tab 5: Top Terms (Word Clouds)
+# ======================================================================================
+with tab5:
+    st.header("Most Frequent Terms per Application")
+    st.write(
+        "Word clouds of the most frequent unigrams and bigrams over the whole period, built from pre-computed counts without loading the raw review text."
+    )
+
+    if top_terms_df is not None and selected_apps:
+        col1, col2 = st.columns(2)
+        with col1:
+            selected_sentiment = st.radio(
+                "Sentiment:", options=["Positif", "Negatif"], horizontal=True
+            )
+        with col2:
+            selected_ngram = st.radio(
+                "Term type:", options=["unigram", "bigram"], horizontal=True
+            )
+
+        # Use the whole-period groups (month == "all"); summing the monthly top
+        # terms would undercount terms that miss a month's top list
+        terms_filtered = top_terms_df[
+            (top_terms_df["app_name"].isin(selected_apps))
+            & (top_terms_df["sentiment"] == selected_sentiment)
+            & (top_terms_df["ngram"] == selected_ngram)
+            & (top_terms_df["month"] == "all")
+        ]
+        term_totals = terms_filtered.set_index(["app_name", "term"])["count"]
+
+        for app_name in selected_apps:
+            if app_name not in term_totals.index.get_level_values("app_name"):
+                continue
+            st.subheader(f"{app_name.capitalize()}")
+            frequencies = term_totals.loc[app_name].nlargest(100).to_dict()
+            wordcloud = WordCloud(
+                width=1200,
+                height=400,
+                background_color="white",
+                colormap="Greens" if selected_sentiment == "Positif" else "Reds",
+            ).generate_from_frequencies(frequencies)
+
+            fig, ax = plt.subplots(figsize=(12, 4))
+            ax.imshow(wordcloud, interpolation="bilinear")
+            ax.axis("off")
+            st.pyplot(fig)
+
+    else:
+        st.warning(
+            "Top terms file not found or no application selected. Run the pre-processing script."
+        )
+
+
 # ======================================================================================
 # Footer
 # ======================================================================================
@@ -0,0 +1,207 @@
+import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+import os
+import time
+
+# ======================================================================================
+# Configuration
+# ======================================================================================
+# Size of the count-min sketch. Memory is fixed at WIDTH * DEPTH * 4 bytes
+# (32 MB with the defaults) no matter how many reviews are streamed through it.
+SKETCH_WIDTH = 2**21
+SKETCH_DEPTH = 4
+
+# Number of terms kept per (app, sentiment, month, ngram) group in the artifact,
+# and the size of the candidate pool tracked while streaming.
+TOP_K = 50
+CANDIDATES_PER_GROUP = 4 * TOP_K
+
+CHUNK_SIZE = 100_000
+
+GROUP_COLUMNS = ["app_name", "sentiment", "month", "ngram"]
+
+# Value of the 'month' column for the whole-period groups. Summing the monthly
+# top terms would miss every month in which a term fell outside the top K.
+ALL_MONTHS = "all"
+
+INPUT_PATH = "data/app_reviews_cleaned.parquet"
+OUTPUT_PATH = "data/top_terms.parquet"
+
+
+# ======================================================================================
+# Count-Min Sketch
+# ======================================================================================
+class CountMinSketch:
+    """
+    Approximate frequency table with fixed memory. Estimates never undercount;
+    they overcount by at most ~e/width of the total count with high probability.
+    """
+
+    # pandas' hash_array needs a 16-character key; two keys give two independent
+    # hashes that are combined into DEPTH row hashes (Kirsch-Mitzenmacher).
+    _HASH_KEYS = ("cms-row-hash-one", "cms-row-hash-two")
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int32)
+
+    def _indices(self, keys):
+        h1 = pd.util.hash_array(keys, hash_key=self._HASH_KEYS[0])
+        h2 = pd.util.hash_array(keys, hash_key=self._HASH_KEYS[1])
+        return [
+            ((h1 + np.uint64(i) * h2) % np.uint64(self.width)).astype(np.int64)
+            for i in range(self.depth)
+        ]
+
+    def update(self, keys, counts):
+        """Adds `counts` to the estimate of each key (both are 1-D arrays)."""
+        for row, idx in enumerate(self._indices(keys)):
+            np.add.at(self.table[row], idx, counts)
+
+    def estimate(self, keys):
+        """Returns the estimated count of each key."""
+        rows = [self.table[row, idx] for row, idx in enumerate(self._indices(keys))]
+        return np.min(rows, axis=0)
+
+
+# ======================================================================================
+# Streaming N-gram Counting
+# ======================================================================================
+def extract_ngrams(text):
+    """Returns the unigrams and bigrams of a cleaned review."""
+    tokens = str(text).split()
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def count_chunk_ngrams(chunk):
+    """
+    Exact unigram/bigram counts for one chunk of reviews, grouped by
+    (app, sentiment, month, ngram type), plus whole-period counts stored with
+    month == ALL_MONTHS.
+    """
+    chunk = chunk[["app_name", "sentiment", "date", "review_cleaned"]].copy()
+    chunk["month"] = pd.to_datetime(chunk["date"]).dt.strftime("%Y-%m")
+    chunk["term"] = chunk["review_cleaned"].map(extract_ngrams)
+    terms = chunk.explode("term").dropna(subset=["term"])
+    terms["ngram"] = np.where(
+        terms["term"].str.contains(" ", regex=False), "bigram", "unigram"
+    )
+    monthly_counts = (
+        terms.groupby(GROUP_COLUMNS + ["term"], observed=True)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+    period_counts = (
+        monthly_counts.groupby(
+            ["app_name", "sentiment", "ngram", "term"], observed=True
+        )["count"]
+        .sum()
+        .reset_index()
+        .assign(month=ALL_MONTHS)
+    )
+    return pd.concat(
+        [monthly_counts, period_counts[monthly_counts.columns]], ignore_index=True
+    )
+
+
+def sketch_keys(counts_df):
+    """Joins the group columns and the term into one key per row for hashing."""
+    return (
+        counts_df["app_name"].astype(str)
+        + "|"
+        + counts_df["sentiment"].astype(str)
+        + "|"
+        + counts_df["month"]
+        + "|"
+        + counts_df["term"]
+    ).to_numpy(dtype=object)
+
+
+def compute_top_terms(chunks, top_k=TOP_K, candidates_per_group=CANDIDATES_PER_GROUP):
+    """
+    Streams chunks of cleaned reviews through a count-min sketch and keeps a
+    bounded pool of heavy-hitter candidates per group.
+    Memory depends on the sketch size and the number of groups, not on the
+    number of reviews.
+    Returns the top `top_k` terms per (app, sentiment, month, ngram).
+    """
+    sketch = CountMinSketch()
+    candidates = pd.DataFrame(
+        {column: pd.Series(dtype=object) for column in GROUP_COLUMNS + ["term"]}
+    ).assign(count=pd.Series(dtype=np.int32))
+    total_reviews = 0
+
+    for chunk in chunks:
+        total_reviews += len(chunk)
+        chunk_counts = count_chunk_ngrams(chunk)
+        if chunk_counts.empty:
+            continue
+
+        keys = sketch_keys(chunk_counts)
+        sketch.update(keys, chunk_counts["count"].to_numpy(dtype=np.int32))
+        # The sketch is cumulative, so the estimate covers every chunk seen so far
+        chunk_counts["count"] = sketch.estimate(keys)
+
+        # Merge with the current pool (newest estimate wins) and prune each
+        # group back down to its candidate budget
+        if not candidates.empty:
+            chunk_counts = pd.concat([candidates, chunk_counts], ignore_index=True)
+        candidates = (
+            chunk_counts.drop_duplicates(subset=GROUP_COLUMNS + ["term"], keep="last")
+            .sort_values("count", ascending=False)
+            .groupby(GROUP_COLUMNS, observed=True)
+            .head(candidates_per_group)
+        )
+        print(f"    {total_reviews} reviews streamed, {len(candidates)} candidates")
+
+    top_terms = (
+        candidates.sort_values(
+            GROUP_COLUMNS + ["count"], ascending=[True] * len(GROUP_COLUMNS) + [False]
+        )
+        .groupby(GROUP_COLUMNS, observed=True)
+        .head(top_k)
+        .reset_index(drop=True)
+    )
+    top_terms["count"] = top_terms["count"].astype(np.int32)
+    return top_terms
+
+
+def iter_dataframe_chunks(df, chunk_size=CHUNK_SIZE):
+    """Yields consecutive row slices of an in-memory DataFrame."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start : start + chunk_size]
+
+
+def iter_parquet_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields non-neutral reviews from a parquet file in record batches, so the
+    full text column is never loaded at once.
+    """
+    parquet_file = pq.ParquetFile(path)
+    columns = ["app_name", "sentiment", "date", "review_cleaned"]
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+        chunk = batch.to_pandas()
+        yield chunk[chunk["sentiment"] != "Netral"]
+
+
+if __name__ == "__main__":
+    print("Starting streaming n-gram statistics...")
+
+    if not os.path.exists(INPUT_PATH):
+        print(
+            f"Error: '{INPUT_PATH}' not found. Please run the main analysis notebook first."
+        )
+        exit()
+
+    start = time.perf_counter()
+    top_terms_df = compute_top_terms(iter_parquet_chunks(INPUT_PATH))
+    top_terms_df.to_parquet(OUTPUT_PATH)
+
+    print("=" * 60)
+    print("N-GRAM STATISTICS COMPLETED!")
+    print(f"Top terms saved to: {OUTPUT_PATH} ({len(top_terms_df)} rows)")
+    print(f"Elapsed time: {time.perf_counter() - start:.1f}s")
+    print("=" * 60)
@@ -0,0 +1,138 @@
+import pandas as pd
+import re
+import string
+import nltk
+from nltk.corpus import stopwords
+
+# ======================================================================================
+# Text Cleaning (same steps as the main analysis notebook)
+# ======================================================================================
+# Analysis starts from 2022
+MIN_REVIEW_DATE = "2022-01-01"
+
+# This regex removes most of the common emoji characters.
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F700-\U0001F77F"  # alchemical symbols
+    "\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
+    "\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+    "\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+    "\U0001FA00-\U0001FA6F"  # Chess Symbols
+    "\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+    "\U00002702-\U000027B0"  # Dingbats
+    "\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE,
+)
+
+# Dictionary for slang word normalization
+SLANG_DICT = {
+    "yg": "yang", "ga": "tidak", "gak": "tidak", "gk": "tidak", "tdk": "tidak",
+    "nya": "nya", "bgt": "banget", "bangettt": "banget", "utk": "untuk",
+    "jg": "juga", "sih": "sih", "aja": "saja", "sya": "saya", "klo": "kalau",
+    "dah": "sudah", "udh": "sudah", "sdh": "sudah", "trs": "terus", "tros": "terus",
+    "pas": "saat", "dg": "dengan", "sm": "sama", "tp": "tapi", "tpi": "tapi",
+    "dr": "dari", "dpt": "dapat", "min": "admin", "adminnya": "admin",
+    "kak": "kakak", "ka": "kakak", "auto": "otomatis", "cancel": "batal",
+    "apk": "aplikasi", "aplikasinya": "aplikasi", "app": "aplikasi",
+    "drivernya": "pengemudi", "driver": "pengemudi",
+}  # fmt: skip
+
+CUSTOM_STOPWORDS = ["sih", "nya", "kak", "ka", "gojek", "grab", "maxim", "indrive"]
+
+# Registry language codes supported by the cleaning steps, mapped to their NLTK
+# stopword language. The slang dictionary and custom stopwords above are
+# Indonesian, so other languages are rejected instead of being cleaned as
+# Indonesian; add an entry (and its slang/stopword lists) to support one.
+SUPPORTED_LANGUAGES = {"id": "indonesian"}
+
+
+def nltk_language(language):
+    """Maps a registry language code (e.g. "id") to its NLTK stopword language."""
+    if language not in SUPPORTED_LANGUAGES:
+        raise ValueError(
+            f"Language '{language}' is not supported by the cleaning steps "
+            f"(supported: {', '.join(SUPPORTED_LANGUAGES)})."
+        )
+    return SUPPORTED_LANGUAGES[language]
+
+
+def ensure_nltk_data(nltk_lang="indonesian"):
+    """
+    Checks for NLTK 'stopwords' package, downloads if missing.
+    """
+    try:
+        stopwords.words(nltk_lang)
+    except LookupError:
+        print(f"'{nltk_lang}' stopwords not found. Downloading...")
+        # Downloads to the default NLTK data path
+        nltk.download("stopwords")
+        print("'stopwords' download complete.")
+
+
+def load_stopwords(language="id"):
+    """
+    Returns the NLTK stopwords for the registry language code `language` plus
+    the custom stopwords.
+    """
+    nltk_lang = nltk_language(language)
+    ensure_nltk_data(nltk_lang)
+    return set(stopwords.words(nltk_lang)) | set(CUSTOM_STOPWORDS)
+
+
+def clean_text_basic(text):
+    """Case folding and removal of emojis, numbers, punctuation and extra whitespace."""
+    # Make sure the input is a string
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = EMOJI_PATTERN.sub(r"", text)
+    text = re.sub(r"\d+", "", text)
+    text = text.translate(str.maketrans("", "", string.punctuation))
+    return text.strip()
+
+
+def normalize_slang(text):
+    """Replaces known slang words with their standard form."""
+    return " ".join(SLANG_DICT.get(word, word) for word in text.split())
+
+
+def remove_stopwords(text, stop_words):
+    """Drops every word found in `stop_words`."""
+    return " ".join(word for word in text.split() if word not in stop_words)
+
+
+def label_sentiment(rating):
+    """Maps a 1-5 star rating to Negatif (1-2), Netral (3) or Positif (4-5)."""
+    if rating <= 2:
+        return "Negatif"
+    elif rating == 3:
+        return "Netral"
+    return "Positif"
+
+
+def clean_reviews(df, language="id", stop_words=None):
+    """
+    Applies the full cleaning pipeline to raw scraped reviews: date filter,
+    'review_cleaned' text column and 'sentiment' label.
+    `language` is the registry language code; unsupported codes raise ValueError.
+    """
+    nltk_language(language)
+    if stop_words is None:
+        stop_words = load_stopwords(language)
+
+    df_cleaned = df.dropna(subset=["review_content"]).copy()
+    df_cleaned["date"] = pd.to_datetime(df_cleaned["date"])
+    df_cleaned = df_cleaned[df_cleaned["date"] >= MIN_REVIEW_DATE]
+
+    df_cleaned["review_cleaned"] = (
+        df_cleaned["review_content"]
+        .map(clean_text_basic)
+        .map(normalize_slang)
+        .map(lambda text: remove_stopwords(text, stop_words))
+    )
+    df_cleaned["sentiment"] = df_cleaned["rating"].map(label_sentiment)
+    return df_cleaned